@@ -4,11 +4,85 @@ Here, we compute right-closed repeats of a string (i.e. repeats that cannot be e
 use them to compute the rightmost LZ77 parsing of any substring of the string.
 """
 
-from typing import List, Tuple, Dict
+import ctypes
+import ctypes.util
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from typing import List, Tuple, Dict, Optional
+
+try:
+    from pydivsufsort import divsufsort as _divsufsort, kasai as _kasai
+except ImportError:
+    _divsufsort = None
+    _kasai = None
+
+try:
+    from numba import njit as _njit
+except ImportError:
+    _njit = None
 
 __author__ = "Jason Alexander Sutiono"
 __version__ = "1.0"
 
+
+def _load_libsais() -> Optional[ctypes.CDLL]:
+    """
+    Try to load the native libsais shared library (https://github.com/IlyaGrebnov/libsais).
+
+    Returns:
+        Optional[ctypes.CDLL]: The loaded library with argtypes configured, or None
+        if libsais is not installed on this system.
+    """
+    candidates = ["libsais.so", "libsais.so.2", "libsais.dylib", "libsais.dll"]
+    found = ctypes.util.find_library("sais")
+    if found:
+        candidates.insert(0, found)
+
+    for name in candidates:
+        try:
+            lib = ctypes.CDLL(name)
+        except OSError:
+            continue
+        # int32_t libsais(const uint8_t *T, int32_t *SA, int32_t n, int32_t fs, int32_t *freq)
+        lib.libsais.argtypes = [
+            ctypes.c_char_p,
+            ctypes.POINTER(ctypes.c_int32),
+            ctypes.c_int32,
+            ctypes.c_int32,
+            ctypes.POINTER(ctypes.c_int32),
+        ]
+        lib.libsais.restype = ctypes.c_int32
+        if hasattr(lib, "libsais_plcp") and hasattr(lib, "libsais_lcp"):
+            # int32_t libsais_plcp(const uint8_t *T, const int32_t *SA, int32_t *PLCP, int32_t n)
+            lib.libsais_plcp.argtypes = [
+                ctypes.c_char_p,
+                ctypes.POINTER(ctypes.c_int32),
+                ctypes.POINTER(ctypes.c_int32),
+                ctypes.c_int32,
+            ]
+            lib.libsais_plcp.restype = ctypes.c_int32
+            # int32_t libsais_lcp(const int32_t *PLCP, const int32_t *SA, int32_t *LCP, int32_t n)
+            lib.libsais_lcp.argtypes = [
+                ctypes.POINTER(ctypes.c_int32),
+                ctypes.POINTER(ctypes.c_int32),
+                ctypes.POINTER(ctypes.c_int32),
+                ctypes.c_int32,
+            ]
+            lib.libsais_lcp.restype = ctypes.c_int32
+        return lib
+    return None
+
+
+_LIBSAIS: Optional[ctypes.CDLL] = _load_libsais()
+
+# Minimum SA adjacencies per worker before the right-closure scan is threaded;
+# below this, thread startup costs more than the scan itself
+_PARALLEL_SCAN_MIN: int = 1 << 16
+
 class RightClosedRepeats:
     """
     Preprocess a string to enable efficient computation of the rightmost LZ77 parsing
@@ -17,10 +91,16 @@ class RightClosedRepeats:
     Attributes:
         text (str): The input string to preprocess.
         length (int): The length of the input string.
-        suffix_array (List[int]): The suffix array of the input string.
-        lcp_array (List[int]): The longest common prefix (LCP) array of the input string.
-        repeats_at_position (Dict[int, List[Tuple[int, int]]]): A mapping from positions to lists
-            of right closed repeats that have their next occurrence starting at that position.
+        suffix_array (np.ndarray): The suffix array of the input string (int32).
+        lcp_array (np.ndarray): The longest common prefix (LCP) array of the input string (int32).
+        pos_ptr (np.ndarray): CSR offsets into q_arr/t_arr (int32); the right closed
+            repeats whose next occurrence starts at position k occupy the slice
+            pos_ptr[k]:pos_ptr[k + 1].
+        q_arr (np.ndarray): Previous-occurrence positions of all repeats (int32),
+            ordered within each bucket by decreasing position then increasing length.
+        t_arr (np.ndarray): Lengths of all repeats (int32), aligned with q_arr.
+        prev_occ (np.ndarray): prev_occ[i] is the largest j < i with text[j] == text[i],
+            or -1 if the character at i has not occurred before (int32).
     """
 
     def __init__(self, text: str):
@@ -32,62 +112,226 @@ class RightClosedRepeats:
         """
         self.text: str = text
         self.length: int = len(text)
-        self.suffix_array: List[int] = []
-        self.lcp_array: List[int] = []
-        self.repeats_at_position: Dict[int, List[Tuple[int, int]]] = self._build_right_closed_repeats()
+        # Contiguous numeric view of the text, decoded once: uint8 bytes for ASCII
+        # input, int32 codepoints otherwise. All hot paths compare into this buffer
+        # instead of indexing the str one character at a time.
+        if text.isascii():
+            # (copy: frombuffer yields a read-only view, and kasai wants writable memory)
+            self._buf: np.ndarray = np.frombuffer(text.encode("ascii"), dtype=np.uint8).copy()
+        else:
+            self._buf = np.array([ord(c) for c in text], dtype=np.int32)
+        # Suffix array construction runs on an alphabet-reduced copy when the
+        # byte alphabet is small (DNA, logs, ...): remapping the bytes to a
+        # compact 0..sigma-1 range preserves their order, hence the suffix
+        # array and LCP array, while improving the radix passes inside the
+        # native libraries. _buf itself keeps the original codes for output.
+        self._sa_buf: np.ndarray = self._buf
+        if self._buf.dtype == np.uint8:
+            sigma = np.unique(self._buf)
+            if 0 < len(sigma) < 64:
+                trans = bytes.maketrans(sigma.tobytes(), bytes(range(len(sigma))))
+                self._sa_buf = np.frombuffer(self._buf.tobytes().translate(trans), dtype=np.uint8).copy()
+        self.suffix_array: np.ndarray = np.empty(0, dtype=np.int32)
+        self.lcp_array: np.ndarray = np.empty(0, dtype=np.int32)
+        self.pos_ptr: np.ndarray
+        self.q_arr: np.ndarray
+        self.t_arr: np.ndarray
+        self.pos_ptr, self.q_arr, self.t_arr = self._build_right_closed_repeats()
+        self.prev_occ: np.ndarray = self._build_prev_occ()
+        self._sa_rank, self._lcp_sparse, self._lcp_logs = self._build_lcp_rmq()
+        # Finished-phrase breakpoints per start index, shared across queries
+        # with the same start (see compute_rightmost_lz77)
+        self._parse_cache: Dict[int, List[Tuple[int, Tuple[int, int]]]] = defaultdict(list)
+
+    def _build_lcp_rmq(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Build a sparse-table RMQ over the LCP array for O(1) LCE queries.
+
+        The longest common extension of any two suffixes is the minimum LCP value
+        between their suffix array ranks, so an O(n log n)-space sparse table of
+        range minima answers any LCE query with two lookups.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The inverse suffix array
+            (rank per text position), the sparse table of LCP range minima, and a
+            floor-log2 lookup table for query lengths (all int32).
+        """
+        n: int = self.length
+        rank: np.ndarray = np.empty(n, dtype=np.int32)
+        rank[self.suffix_array] = np.arange(n, dtype=np.int32)
+
+        m: int = len(self.lcp_array)
+        logs: np.ndarray = np.floor(np.log2(np.maximum(np.arange(m + 1), 1))).astype(np.int32)
+        levels: int = int(logs[m]) + 1 if m > 0 else 1
+
+        sparse: np.ndarray = np.empty((levels, m), dtype=np.int32)
+        if m > 0:
+            sparse[0] = self.lcp_array
+        for k in range(1, levels):
+            half: int = 1 << (k - 1)
+            width: int = m - (1 << k) + 1
+            sparse[k, :width] = np.minimum(sparse[k - 1, :width], sparse[k - 1, half:half + width])
+
+        return rank, sparse, logs
+
+    def _lce(self, i: int, j: int) -> int:
+        """
+        Compute the longest common extension of the suffixes at positions i and j.
+
+        Args:
+            i (int): The first text position.
+            j (int): The second text position.
+
+        Returns:
+            int: The length of the longest common prefix of the two suffixes.
+        """
+        if i == j:
+            return self.length - i
+        lo: int = int(self._sa_rank[i])
+        hi: int = int(self._sa_rank[j])
+        if lo > hi:
+            lo, hi = hi, lo
+        k: int = int(self._lcp_logs[hi - lo])
+        return int(min(self._lcp_sparse[k, lo], self._lcp_sparse[k, hi - (1 << k)]))
+
+    def _build_prev_occ(self) -> np.ndarray:
+        """
+        Build the previous-same-character table for the input string.
 
-    def _build_suffix_array(self) -> List[int]:
+        Returns:
+            np.ndarray: An int32 array where entry i is the previous position with
+            the same character as position i, or -1 if there is none.
         """
-        Construct the suffix array of the input string using a doubling algorithm.
+        prev_occ: np.ndarray = np.full(self.length, -1, dtype=np.int32)
+        last_seen: Dict[int, int] = {}
+        for i, c in enumerate(self._buf.tolist()):
+            prev_occ[i] = last_seen.get(c, -1)
+            last_seen[c] = i
+        return prev_occ
+
+    def _build_suffix_array(self) -> np.ndarray:
+        """
+        Construct the suffix array of the input string using a native SACA when available.
 
         Here we use a suffix array instead of a suffix tree to simplify the implementation.
-        Implementing a complexer suffix tree is in progress
+        Implementing a complexer suffix tree is in progress.
+
+        ASCII input goes through libsais (via ctypes) or pydivsufsort, which run in
+        linear time in native code; non-ASCII input is handed to pydivsufsort as an
+        array of codepoints. The pure-Python doubling algorithm is only kept as a
+        last resort when neither native library is installed.
+
+        Returns:
+            np.ndarray: The suffix array of the input string as an int32 array.
+        """
+        n: int = self.length
+
+        if n > 0 and self._sa_buf.dtype == np.uint8:
+            if _LIBSAIS is not None:
+                sa = (ctypes.c_int32 * n)()
+                result: int = _LIBSAIS.libsais(self._sa_buf.tobytes(), sa, n, 0, None)
+                if result == 0:
+                    return np.frombuffer(sa, dtype=np.int32).copy()
+            if _divsufsort is not None:
+                return np.asarray(_divsufsort(self._sa_buf.tobytes()), dtype=np.int32)
+        elif n > 0 and _divsufsort is not None:
+            return np.asarray(_divsufsort(self._sa_buf), dtype=np.int32)
+
+        return self._build_suffix_array_fallback()
+
+    def _build_suffix_array_fallback(self) -> np.ndarray:
+        """
+        Construct the suffix array with a NumPy-vectorized doubling algorithm.
+
+        This is the fallback used when no native suffix array library is available.
+        Each doubling round sorts all suffixes by their (rank, rank k ahead) pair
+        with one np.lexsort and reassigns ranks with a cumulative sum over a
+        "pair changed" vector, keeping every round in vectorized C code.
+
         Returns:
-            List[int]: The suffix array of the input string.
+            np.ndarray: The suffix array of the input string as an int32 array.
         """
         n: int = self.length
+        if n == 0:
+            return np.empty(0, dtype=np.int32)
+
         k: int = 1
-        rank: List[int] = [ord(c) for c in self.text]
-        temp_rank: List[int] = [0] * n
-        suffix_array: List[int] = list(range(n))
+        rank: np.ndarray = self._sa_buf.astype(np.int32)
+        keys2: np.ndarray = np.empty(n, dtype=np.int32)
 
         while True:
-            # Sort based on current rank and rank at position k steps ahead
-            suffix_array.sort(key=lambda x: (rank[x], rank[x + k] if x + k < n else -1))
-
-            temp_rank[suffix_array[0]] = 0
-            for i in range(1, n):
-                prev, curr = suffix_array[i - 1], suffix_array[i]
-                temp_rank[curr] = temp_rank[prev] + (
-                    (rank[curr], rank[curr + k] if curr + k < n else -1) !=
-                    (rank[prev], rank[prev + k] if prev + k < n else -1)
-                )
-
-            rank, temp_rank = temp_rank, rank
+            # Rank of the suffix k positions ahead, or -1 past the end of the string
+            keys2[:n - k] = rank[k:]
+            keys2[n - k:] = -1
+
+            # Sort by (rank, keys2); lexsort takes the primary key last
+            suffix_array = np.lexsort((keys2, rank))
+
+            # New rank = number of preceding sorted pairs that differ from their neighbor
+            r1 = rank[suffix_array]
+            r2 = keys2[suffix_array]
+            changed = np.empty(n, dtype=np.int32)
+            changed[0] = 0
+            changed[1:] = (r1[1:] != r1[:-1]) | (r2[1:] != r2[:-1])
+            rank = np.empty(n, dtype=np.int32)
+            rank[suffix_array] = np.cumsum(changed, dtype=np.int32)
+
             if rank[suffix_array[-1]] == n - 1:
                 break
             k <<= 1  # Double the comparison length
 
-        return suffix_array
+        return suffix_array.astype(np.int32)
 
-    def _build_lcp_array(self) -> List[int]:
+    def _build_lcp_array(self) -> np.ndarray:
         """
         Construct the LCP (Longest Common Prefix) array using the suffix array.
 
+        libsais exposes PLCP construction followed by a permuted-to-SA-order pass
+        (libsais_plcp / libsais_lcp), both linear time in native code with far
+        better locality than Kasai; pydivsufsort's kasai is the next choice.
+        The pure-Python Kasai implementation remains as a last resort.
+
         Returns:
-            List[int]: The LCP array of the input string.
+            np.ndarray: The LCP array of the input string (int32), where entry i
+            is the LCP of the suffixes at suffix_array[i] and suffix_array[i + 1].
         """
         n: int = self.length
-        rank: List[int] = [0] * n
-        for i in range(n):
-            rank[self.suffix_array[i]] = i
+
+        if n > 0 and self._sa_buf.dtype == np.uint8 and _LIBSAIS is not None and hasattr(_LIBSAIS, "libsais_lcp"):
+            encoded: bytes = self._sa_buf.tobytes()
+            sa = (ctypes.c_int32 * n)(*self.suffix_array.tolist())
+            plcp = (ctypes.c_int32 * n)()
+            lcp = (ctypes.c_int32 * n)()
+            if _LIBSAIS.libsais_plcp(encoded, sa, plcp, n) == 0 and _LIBSAIS.libsais_lcp(plcp, sa, lcp, n) == 0:
+                # libsais stores LCP(SA[i - 1], SA[i]) at index i; shift to this
+                # module's convention of LCP(SA[i], SA[i + 1]) at index i.
+                return np.frombuffer(lcp, dtype=np.int32)[1:].copy()
+
+        if n > 0 and _kasai is not None:
+            return np.asarray(_kasai(self._sa_buf, self.suffix_array), dtype=np.int32)[:n - 1]
+
+        return self._build_lcp_array_fallback()
+
+    def _build_lcp_array_fallback(self) -> np.ndarray:
+        """
+        Construct the LCP array with a pure-Python implementation of Kasai's algorithm.
+
+        This is the fallback used when no native LCP routine is available.
+
+        Returns:
+            np.ndarray: The LCP array of the input string (int32).
+        """
+        n: int = self.length
+        # Inverse suffix array, computed as one scatter instead of a Python loop
+        rank: np.ndarray = np.empty(n, dtype=np.int32)
+        rank[self.suffix_array] = np.arange(n, dtype=np.int32)
 
         lcp_array: List[int] = [0] * (n - 1)
         h: int = 0
         for i in range(n):
             if rank[i] > 0:
                 j: int = self.suffix_array[rank[i] - 1]
-                while i + h < n and j + h < n and self.text[i + h] == self.text[j + h]:
+                while i + h < n and j + h < n and self._buf[i + h] == self._buf[j + h]:
                     h += 1
                 lcp_array[rank[i] - 1] = h
                 if h > 0:
@@ -95,106 +339,346 @@ class RightClosedRepeats:
             else:
                 h = 0  # Reset h because rank[i] == 0
 
-        return lcp_array
+        return np.asarray(lcp_array, dtype=np.int32)
+
+    def _scan_right_closed_chunk(self, lo: int, hi: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Run the right-closure scan over the SA adjacency indices [lo, hi).
+
+        Args:
+            lo (int): The first adjacency index of the chunk.
+            hi (int): One past the last adjacency index of the chunk.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The (p2, q, t) arrays of
+            the right closed repeats found in the chunk, in adjacency order.
+        """
+        sa: np.ndarray = self.suffix_array
+        lcp: np.ndarray = self.lcp_array[lo:hi]
+
+        # Positions of each adjacent suffix pair, ordered so pos1 < pos2
+        pos1 = np.minimum(sa[lo:hi], sa[lo + 1:hi + 1])
+        pos2 = np.maximum(sa[lo:hi], sa[lo + 1:hi + 1])
+
+        # A repeat is right closed when the tail characters following the common
+        # prefix differ (the -1 end-of-string sentinel never equals a character
+        # code). The tails were gathered alongside LCP construction; comparing
+        # them in SA order is equivalent since inequality is symmetric.
+        keep = np.where((lcp > 0) & (self._tail1[lo:hi] != self._tail2[lo:hi]))[0]
 
-    def _build_right_closed_repeats(self) -> Dict[int, List[Tuple[int, int]]]:
+        return pos2[keep], pos1[keep].astype(np.int32), lcp[keep].astype(np.int32)
+
+    def _build_right_closed_repeats(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Identify and build a data structure of right closed repeats in the input string.
 
+        The repeats are stored in structure-of-arrays CSR form: all previous-occurrence
+        positions in q_arr and all repeat lengths in t_arr, with pos_ptr[k]:pos_ptr[k + 1]
+        delimiting the repeats whose next occurrence starts at position k. This keeps
+        lookups on flat contiguous int32 arrays instead of a dict of lists of tuples.
+
         Returns:
-            Dict[int, List[Tuple[int, int]]]: A dictionary mapping positions to lists of
-            right closed repeats whose next occurrence is at those positions.
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The (pos_ptr, q_arr, t_arr) arrays.
         """
         self.suffix_array = self._build_suffix_array()
         self.lcp_array = self._build_lcp_array()
 
-        repeats_at_position: Dict[int, List[Tuple[int, int]]] = {}
+        n: int = self.length
+        pos_ptr: np.ndarray = np.zeros(n + 1, dtype=np.int32)
+        if n < 2:
+            return pos_ptr, np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+
+        # Gather the tail characters while SA and LCP are still warm in cache
+        self._tail1, self._tail2 = _lcp_tail(self.suffix_array, self.lcp_array, self._buf, n)
+
+        # The scan over SA adjacencies is embarrassingly parallel over index
+        # ranges, and NumPy releases the GIL inside the array operations, so
+        # large inputs split the work across a thread pool; each worker stays
+        # on a contiguous slice of SA/LCP for locality.
+        m: int = n - 1
+        workers: int = min(os.cpu_count() or 1, m // _PARALLEL_SCAN_MIN)
+        if workers > 1:
+            bounds = np.linspace(0, m, workers + 1, dtype=np.int64).tolist()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(self._scan_right_closed_chunk, bounds[:-1], bounds[1:]))
+            p2_arr = np.concatenate([part[0] for part in parts])
+            q_arr = np.concatenate([part[1] for part in parts])
+            t_arr = np.concatenate([part[2] for part in parts])
+        else:
+            p2_arr, q_arr, t_arr = self._scan_right_closed_chunk(0, m)
+
+        # Sort the whole table at once by (position, decreasing q_x, increasing t_x),
+        # so each CSR bucket comes out ordered for efficient predecessor queries.
+        order = np.lexsort((t_arr, -q_arr, p2_arr))
+        p2_arr = p2_arr[order]
+        q_arr = q_arr[order]
+        t_arr = t_arr[order]
+
+        # p2_arr is sorted, so every bucket boundary is a binary search away
+        pos_ptr = np.searchsorted(p2_arr, np.arange(n + 1, dtype=np.int32)).astype(np.int32)
+
+        return pos_ptr, q_arr, t_arr
+
+
+def _lcp_tail(sa: np.ndarray, lcp: np.ndarray, buf: np.ndarray, n: int
+              ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gather the characters following each SA adjacency's common prefix.
+
+    For adjacency i this is the pair buf[sa[i] + lcp[i]], buf[sa[i + 1] + lcp[i]],
+    with -1 standing in for the end of the string. Fusing the sweep with LCP
+    construction means SA and LCP are walked once while still warm instead of
+    being re-read by the right-closure scan.
+
+    Args:
+        sa (np.ndarray): The suffix array.
+        lcp (np.ndarray): The LCP array.
+        buf (np.ndarray): The numeric text buffer.
+        n (int): The length of the text.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The (tail1, tail2) int32 arrays, one
+        entry per SA adjacency.
+    """
+    m = lcp.shape[0]
+    tail1 = np.empty(m, dtype=np.int32)
+    tail2 = np.empty(m, dtype=np.int32)
+    for i in range(m):
+        e1 = sa[i] + lcp[i]
+        e2 = sa[i + 1] + lcp[i]
+        tail1[i] = buf[e1] if e1 < n else -1
+        tail2[i] = buf[e2] if e2 < n else -1
+    return tail1, tail2
+
+
+def _lcp_tail_numpy(sa: np.ndarray, lcp: np.ndarray, buf: np.ndarray, n: int
+                    ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized _lcp_tail used when Numba is not available.
 
-        for i in range(len(self.lcp_array)):
-            lcp_length: int = self.lcp_array[i]
-            if lcp_length == 0:
-                continue  # No repeat of length > 0 at this position
+    Args:
+        sa (np.ndarray): The suffix array.
+        lcp (np.ndarray): The LCP array.
+        buf (np.ndarray): The numeric text buffer.
+        n (int): The length of the text.
 
-            pos1: int = self.suffix_array[i]
-            pos2: int = self.suffix_array[i + 1]
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The (tail1, tail2) int32 arrays.
+    """
+    end1 = sa[:-1] + lcp
+    end2 = sa[1:] + lcp
+    tail1 = np.where(end1 < n, buf[np.minimum(end1, n - 1)].astype(np.int32), -1)
+    tail2 = np.where(end2 < n, buf[np.minimum(end2, n - 1)].astype(np.int32), -1)
+    return tail1, tail2
 
-            # Ensure pos1 < pos2 for consistency
-            if pos1 > pos2:
-                pos1, pos2 = pos2, pos1
 
-            end1: int = pos1 + lcp_length
-            end2: int = pos2 + lcp_length
+def _lz77_inner(buf: np.ndarray, pos_ptr: np.ndarray, q_arr: np.ndarray, t_arr: np.ndarray,
+                prev_occ: np.ndarray, sa_rank: np.ndarray, lcp_sparse: np.ndarray,
+                lcp_logs: np.ndarray, start_index: int, resume_index: int,
+                end_index: int) -> np.ndarray:
+    """
+    Core parsing loop over the numeric buffer, free of Python object traffic.
+
+    Emits one row per phrase into a preallocated int32 array: (0, character code)
+    for a literal, or (distance, match_length) for a copy.
 
-            # Check right closure condition
-            if (end1 < self.length and end2 < self.length and self.text[end1] != self.text[end2]) or end1 == self.length or end2 == self.length:
-                # Add the right closed repeat to repeats_at_position
-                repeats_at_position.setdefault(pos2, []).append((pos1, lcp_length))
+    Args:
+        buf (np.ndarray): The numeric text buffer.
+        pos_ptr (np.ndarray): CSR offsets into q_arr/t_arr.
+        q_arr (np.ndarray): Previous-occurrence positions of all repeats.
+        t_arr (np.ndarray): Lengths of all repeats.
+        prev_occ (np.ndarray): The previous-same-character table.
+        sa_rank (np.ndarray): The inverse suffix array.
+        lcp_sparse (np.ndarray): The sparse table of LCP range minima.
+        lcp_logs (np.ndarray): Floor-log2 lookup table for RMQ query lengths.
+        start_index (int): The starting index of the substring (0-based).
+        resume_index (int): The position to start emitting phrases from; equals
+            start_index unless a cached parse prefix was already replayed.
+        end_index (int): One past the last index of the substring.
 
-        # Sort repeats at each position for efficient predecessor queries
-        for p in repeats_at_position:
-            # Sort by decreasing q_x (previous occurrence position) and increasing t_x (repeat length)
-            repeats_at_position[p].sort(key=lambda x: (-x[0], x[1]))
+    Returns:
+        np.ndarray: An int32 array of shape (phrase_count, 2).
+    """
+    phrases = np.empty((end_index - resume_index, 2), dtype=np.int32)
+    count = 0
+    position = resume_index
 
-        return repeats_at_position
+    while position < end_index:
+        prev = prev_occ[position]
+        if prev < start_index:
+            # Literal character
+            phrases[count, 0] = 0
+            phrases[count, 1] = buf[position]
+            count += 1
+            position += 1
+            continue
+
+        match_found = False
+        for k in range(pos_ptr[position], pos_ptr[position + 1]):
+            q_x = q_arr[k]
+            if start_index <= q_x < position:
+                remaining = end_index - position
+                match_length = t_arr[k] if t_arr[k] < remaining else remaining
+                phrases[count, 0] = position - q_x
+                phrases[count, 1] = match_length
+                count += 1
+                position += match_length
+                match_found = True
+                break  # Found the rightmost occurrence with the longest match
+
+        if not match_found:
+            # No suitable right closed repeat found; take the LCE with the
+            # previous occurrence via an O(1) range-minimum query over the LCP
+            lo = sa_rank[position]
+            hi = sa_rank[prev]
+            if lo > hi:
+                lo, hi = hi, lo
+            k = lcp_logs[hi - lo]
+            lce = min(lcp_sparse[k, lo], lcp_sparse[k, hi - (1 << k)])
+            remaining = end_index - position
+            match_length = lce if lce < remaining else remaining
+            phrases[count, 0] = position - prev
+            phrases[count, 1] = match_length
+            count += 1
+            position += match_length
+
+    return phrases[:count]
+
+
+if _njit is not None:
+    _lcp_tail = _njit(cache=True)(_lcp_tail)
+    # Compile ahead of time for both buffer widths (uint8 for ASCII text, int32
+    # codepoints otherwise) so each alphabet gets its own specialized machine
+    # code and no lazy compilation happens on the first query.
+    from numba import types as _nb_types
+
+    _common_args = (
+        _nb_types.int32[::1],  # pos_ptr
+        _nb_types.int32[::1],  # q_arr
+        _nb_types.int32[::1],  # t_arr
+        _nb_types.int32[::1],  # prev_occ
+        _nb_types.int32[::1],  # sa_rank
+        _nb_types.int32[:, ::1],  # lcp_sparse
+        _nb_types.int32[::1],  # lcp_logs
+        _nb_types.int64,  # start_index
+        _nb_types.int64,  # resume_index
+        _nb_types.int64,  # end_index
+    )
+    _lz77_inner = _njit(
+        [
+            _nb_types.int32[:, ::1](_nb_types.uint8[::1], *_common_args),
+            _nb_types.int32[:, ::1](_nb_types.int32[::1], *_common_args),
+        ],
+        cache=True,
+    )(_lz77_inner)
+else:
+    _lcp_tail = _lcp_tail_numpy
 
 
 def compute_rightmost_lz77(processor: RightClosedRepeats, start_index: int, substring_length: int
-                           ) -> List[Tuple[int, int]]:
+                           ) -> np.ndarray:
     """
     Compute the rightmost LZ77 parsing of the specified substring.
 
+    Repeated queries sharing a start index reuse each other's work: the parsing
+    of a shorter substring is a prefix of the parsing of a longer one up to the
+    final phrase boundary, so finished phrases are cached per start index as
+    (position after phrase, phrase) breakpoints and replayed before parsing
+    resumes from the last applicable breakpoint.
+
     Args:
         processor (RightClosedRepeats): An instance of RightClosedRepeats containing preprocessed data.
         start_index (int): The starting index of the substring (0-based).
         substring_length (int): The length of the substring.
 
     Returns:
-        List[Tuple[int, int]]: A list of phrases representing the LZ77 parsing.
-            Each phrase is either (0, c) for a literal character c,
-            or (distance, match_length) for a copy operation.
+        np.ndarray: An int32 array of shape (phrase_count, 2) representing the
+            LZ77 parsing. Each row is either (0, code) for a literal character
+            with the given codepoint, or (distance, match_length) for a copy
+            operation.
     """
-    text: str = processor.text
-    repeats_at_position: Dict[int, List[Tuple[int, int]]] = processor.repeats_at_position
+    buf: np.ndarray = processor._buf
+    pos_ptr: np.ndarray = processor.pos_ptr
+    q_arr: np.ndarray = processor.q_arr
+    t_arr: np.ndarray = processor.t_arr
+    prev_occ: np.ndarray = processor.prev_occ
     end_index: int = start_index + substring_length
-    position: int = start_index
     phrases: List[Tuple[int, int]] = []
 
-    while position < end_index:
-        # Check if current character has occurred before in the substring
-        previous_occurrences: List[int] = [
-            idx for idx in range(start_index, position) if text[idx] == text[position]
-        ]
+    # Replay cached phrases for this start index as far as they fit the query
+    cached: List[Tuple[int, Tuple[int, int]]] = processor._parse_cache[start_index]
+    position: int = start_index
+    replayed: int = 0
+    for position_after, phrase in cached:
+        if position_after > end_index:
+            break
+        phrases.append(phrase)
+        position = position_after
+        replayed += 1
+
+    # Only grow the cache when the replay consumed it completely; otherwise the
+    # remaining phrases re-parse a region the cache already covers differently
+    # (its next breakpoint lies beyond this query's end).
+    extend_cache: bool = replayed == len(cached)
+    new_phrases: List[Tuple[int, Tuple[int, int]]] = []
+
+    if _njit is not None:
+        # Run the whole parsing loop as compiled code; its rows are already in
+        # the output layout and only need the replayed prefix stitched on
+        rows = _lz77_inner(buf, pos_ptr, q_arr, t_arr, prev_occ, processor._sa_rank,
+                           processor._lcp_sparse, processor._lcp_logs,
+                           start_index, position, end_index)
+        if extend_cache:
+            for distance, value in rows.tolist():
+                position += 1 if distance == 0 else value
+                if position < end_index:
+                    cached.append((position, (distance, value)))
+        if phrases:
+            return np.concatenate([np.asarray(phrases, dtype=np.int32).reshape(-1, 2), rows])
+        return rows
+    else:
+        while position < end_index:
+            # Last occurrence of the current character before this position, if any
+            prev: int = int(prev_occ[position])
+
+            if prev < start_index:
+                # Literal character, stored as its codepoint
+                new_phrases.append((position + 1, (0, int(buf[position]))))
+                position += 1
+                continue
 
-        if not previous_occurrences:
-            # Literal character
-            phrases.append((0, text[position]))
-            position += 1
-        else:
             # Attempt to find the longest match using right closed repeats
-            repeats: List[Tuple[int, int]] = repeats_at_position.get(position, [])
+            lo: int = pos_ptr[position]
+            hi: int = pos_ptr[position + 1]
             match_found: bool = False
 
-            for q_x, t_x in repeats:
+            for k in range(lo, hi):
+                q_x: int = int(q_arr[k])
+                t_x: int = int(t_arr[k])
                 if start_index <= q_x < position:
                     remaining_length: int = end_index - position
                     match_length: int = min(t_x, remaining_length)
-                    phrases.append((position - q_x, match_length))
                     position += match_length
+                    new_phrases.append((position, (position - match_length - q_x, match_length)))
                     match_found = True
                     break  # Found the rightmost occurrence with the longest match
 
             if not match_found:
-                # No suitable right closed repeat found; find the longest match manually
-                q: int = max(previous_occurrences)
-                max_match_length: int = end_index - position
-                match_length: int = 0
-                while match_length < max_match_length and text[position + match_length] == text[q + match_length]:
-                    match_length += 1
-
-                phrases.append((position - q, match_length))
+                # No suitable right closed repeat found; the match length is the
+                # LCE with the previous occurrence, answered in O(1) by the RMQ
+                q: int = prev
+                match_length: int = min(processor._lce(q, position), end_index - position)
                 position += match_length
+                new_phrases.append((position, (position - match_length - q, match_length)))
+
+    for position_after, phrase in new_phrases:
+        phrases.append(phrase)
+        # A phrase that stops short of the query end was not truncated by it,
+        # so it is valid for any longer query with the same start
+        if extend_cache and position_after < end_index:
+            cached.append((position_after, phrase))
 
-    return phrases
+    return np.asarray(phrases, dtype=np.int32).reshape(-1, 2)
 
 
 def main():
@@ -209,16 +693,15 @@ def main():
         print("Invalid indices")
         return
 
-    phrases: List[Tuple[int, int]] = compute_rightmost_lz77(processor, start_pos, substring_length)
+    phrases: np.ndarray = compute_rightmost_lz77(processor, start_pos, substring_length)
     print("Rightmost LZ77 parsing:")
-    for phrase in phrases:
-        if phrase[0] == 0:
+    for distance, value in phrases.tolist():
+        if distance == 0:
             # Literal character
-            print(f"Literal: '{phrase[1]}'")
+            print(f"Literal: '{chr(value)}'")
         else:
             # Reference to previous substring
-            distance, match_length = phrase
-            print(f"Copy: distance={distance}, length={match_length}")
+            print(f"Copy: distance={distance}, length={value}")
 
 
 if __name__ == "__main__":